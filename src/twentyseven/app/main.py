@@ -2,14 +2,35 @@
 Main FastAPI application entry point for The Council of the Twenty-Seven API.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from twentyseven.app.middleware import CompressionMiddleware, ProfilingMiddleware
 from twentyseven.app.routers.generator_router import router as generator_router
 from twentyseven.app.routers.models_router import router as models_router
 from twentyseven.app.routers.perspectives_router import router as perspectives_router
 from twentyseven.app.routers.system_router import router as system_router
+from twentyseven.config.settings import settings
+from twentyseven.lm.local_models import local_model_registry, start_warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start local model discovery and warm-up on startup; stop discovery on shutdown."""
+    local_model_registry.start()
+    start_warm_up(settings.warmup_models)
+    yield
+    local_model_registry.stop()
+
+
+app = FastAPI(title="The Council of the Twenty-Seven API", lifespan=lifespan)
 
-app = FastAPI(title="The Council of the Twenty-Seven API")
+app.add_middleware(
+    CompressionMiddleware, minimum_size=settings.compression_minimum_size
+)
+# Added last so profiles cover the whole request, including compression.
+app.add_middleware(ProfilingMiddleware, path_prefix="/api/generator")
 
 app.include_router(generator_router, prefix="/api")
 app.include_router(system_router, prefix="/api")
@@ -0,0 +1,171 @@
+"""
+ASGI middleware for the API application.
+"""
+
+import gzip
+from typing import List, Optional
+
+import brotli
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from twentyseven.app.profiling import PROFILE_ID_HEADER, start_request_profile
+
+
+def _select_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the preferred supported content encoding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): The raw Accept-Encoding header value.
+
+    Returns:
+        Optional[str]: 'br', 'gzip', or None if neither is acceptable.
+    """
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        key, _, value = params.strip().partition("=")
+        if key.strip() == "q":
+            try:
+                if float(value) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    if "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compress complete (non-streaming) responses with brotli or gzip above a size threshold.
+
+    Streaming responses and responses that already carry a Content-Encoding are
+    passed through unchanged. Strong ETags on compressed bodies are made weak.
+
+    Attributes:
+        app (ASGIApp): The wrapped ASGI application.
+        minimum_size (int): Minimum body size in bytes before compressing.
+        gzip_level (int): gzip compression level.
+        brotli_quality (int): brotli compression quality.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                # Streaming response: flush what we have and stop intercepting.
+                passthrough = True
+                await send(start_message)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": b"".join(chunks),
+                        "more_body": True,
+                    }
+                )
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start_message["headers"])
+            if len(body) >= self.minimum_size and "content-encoding" not in headers:
+                if encoding == "br":
+                    body = brotli.compress(body, quality=self.brotli_quality)
+                else:
+                    body = gzip.compress(body, compresslevel=self.gzip_level)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                # A strong validator must differ per content-coding; weaken it instead.
+                etag = headers.get("etag")
+                if etag is not None and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class ProfilingMiddleware:
+    """
+    Profile sampled or X-Profile requests under a path prefix, from the first byte received to the last byte sent.
+
+    The profile is exposed to handlers as ``request.state.profile`` and its
+    identifier is returned in the X-Profile-Id response header. Add this
+    middleware last so that it wraps every other middleware.
+
+    Attributes:
+        app (ASGIApp): The wrapped ASGI application.
+        path_prefix (str): Only requests whose path starts with this prefix are profiled.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str = "/") -> None:
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        profile = start_request_profile(Headers(scope=scope), scope["path"])
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["profile"] = profile
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                profile.mark("response_start")
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile.profile_id
+            await send(message)
+
+        profile.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.finish(status_code)
+            await run_in_threadpool(profile.save)
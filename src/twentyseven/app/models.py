@@ -2,11 +2,29 @@
 Pydantic models for API requests and responses.
 """
 
-from typing import Dict
+from typing import Dict, Literal, Optional
 
 from pydantic import BaseModel, Field
 
 
+class ModelConstraints(BaseModel):
+    """
+    Constraints for automatic model selection, used when the requested model is 'auto'
+    or 'auto:<provider>'. All limits are hard: if no model meets them, the request fails.
+
+    Attributes:
+        min_quality_tier (Optional[int]): Minimum configured quality tier of the selected model.
+        max_latency (Optional[float]): Maximum estimated generation latency in seconds.
+        max_cost (Optional[float]): Maximum estimated cost of the generation.
+        prefer (str): 'latency' to pick the fastest eligible model, 'cost' to pick the cheapest.
+    """
+
+    min_quality_tier: Optional[int] = None
+    max_latency: Optional[float] = None
+    max_cost: Optional[float] = None
+    prefer: Literal["latency", "cost"] = "latency"
+
+
 class QuestionRequest(BaseModel):
     """
     Request model for submitting a philosophical question and optional perspective and model.
@@ -14,12 +32,15 @@ class QuestionRequest(BaseModel):
     Attributes:
         question (str): The philosophical question to be answered.
         perspective (str): The philosophical perspective to use for the answer.
-        model (str): The model name to use for generation.
+        model (str): The model name to use for generation, or 'auto' / 'auto:<provider>'
+            to select one.
+        model_constraints (Optional[ModelConstraints]): Constraints for automatic model selection.
     """
 
     question: str
     perspective: str
     model: str
+    model_constraints: Optional[ModelConstraints] = None
 
 
 class AnswerMetadata(BaseModel):
@@ -66,11 +87,14 @@ class ConclusionRequest(BaseModel):
 
     Attributes:
         answers (Dict[str, str]): Dictionary mapping perspective names to answers.
-        model (str): The model name to use for generation.
+        model (str): The model name to use for generation, or 'auto' / 'auto:<provider>'
+            to select one.
+        model_constraints (Optional[ModelConstraints]): Constraints for automatic model selection.
     """
 
     answers: Dict[str, str]
     model: str
+    model_constraints: Optional[ModelConstraints] = None
 
 
 class ConclusionMetadata(BaseModel):
@@ -107,3 +131,20 @@ class ConclusionResponse(BaseModel):
 
     conclusion: str
     metadata: ConclusionMetadata
+
+
+class ModelStatus(BaseModel):
+    """
+    Availability and load state of a model.
+
+    Attributes:
+        name (str): The model name.
+        provider (str): The provider serving the model (e.g., 'local', 'openrouter').
+        state (Literal["warm", "cold", "remote"]): 'warm' if loaded and ready, 'cold'
+            if the first request will pay a model-load stall, or 'remote' for hosted
+            models whose load state is unknown.
+    """
+
+    name: str
+    provider: str
+    state: Literal["warm", "cold", "remote"]
@@ -0,0 +1,362 @@
+"""
+On-demand sampling profiler for generator requests.
+
+A profiled request gets a background thread sampling the stacks of the event
+loop thread, for the whole request, and of the worker thread running its
+generation. Event loop samples also include any other requests handled
+concurrently. Each sample is weighted by the wall-clock and thread CPU time
+elapsed since the previous one, producing a wall-clock and a CPU profile from
+the same run. Stacks are prefixed with the thread's role ('event-loop' or
+'worker'). Profiles are stored in ``settings.profiling_dir`` in the
+collapsed-stack ("folded") format read by flamegraph.pl and speedscope, next to
+a JSON summary with the duration of each request phase.
+"""
+
+import json
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from starlette.datastructures import Headers
+
+from twentyseven.config.logger import logger
+from twentyseven.config.settings import settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_KINDS = ("wall", "cpu")
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def _frame_label(frame) -> str:
+    """Label a frame as module.qualname for aggregation across samples."""
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_qualname}"
+
+
+class _StackSampler:
+    """
+    Periodically sample the stacks of a set of threads, accumulating wall and CPU time per stack.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.wall: Counter = Counter()
+        self.cpu: Counter = Counter()
+        self._lock = threading.Lock()
+        # thread id -> (role, CPU clock id, CPU time at the previous sample)
+        self._threads: Dict[int, Tuple[str, Optional[int], float]] = {}
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def _cpu_time(self, clock_id: Optional[int]) -> float:
+        if clock_id is None:
+            return 0.0
+        try:
+            return time.clock_gettime(clock_id)
+        except OSError:
+            return 0.0
+
+    def add_thread(self, thread_id: int, role: str) -> None:
+        """Start sampling a thread, labelling its stacks with ``role``."""
+        try:
+            clock_id = time.pthread_getcpuclockid(thread_id)
+        except (AttributeError, OSError):
+            # Per-thread CPU clocks are unavailable on this platform.
+            clock_id = None
+        with self._lock:
+            self._threads[thread_id] = (role, clock_id, self._cpu_time(clock_id))
+
+    def remove_thread(self, thread_id: int) -> None:
+        """Stop sampling a thread."""
+        with self._lock:
+            self._threads.pop(thread_id, None)
+
+    def _run(self) -> None:
+        last_wall = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            now_wall = time.perf_counter()
+            with self._lock:
+                for thread_id, (role, clock_id, last_cpu) in list(
+                    self._threads.items()
+                ):
+                    now_cpu = self._cpu_time(clock_id)
+                    self._threads[thread_id] = (role, clock_id, now_cpu)
+                    frame = frames.get(thread_id)
+                    if frame is None:
+                        continue
+                    labels: List[str] = []
+                    while frame is not None:
+                        labels.append(_frame_label(frame))
+                        frame = frame.f_back
+                    labels.append(role)
+                    stack = ";".join(reversed(labels))
+                    self.wall[stack] += now_wall - last_wall
+                    self.cpu[stack] += max(0.0, now_cpu - last_cpu)
+            last_wall = now_wall
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+
+class RequestProfile:
+    """
+    Profile of a single generator request, from the first byte received to the last byte sent.
+
+    The summary splits the request into phases: 'request' (body parsing and
+    validation), 'generation', 'response' (response validation and
+    serialization) and 'send' (compression and sending the body).
+
+    Attributes:
+        profile_id (str): Unique identifier, returned to the client in the X-Profile-Id header.
+        path (str): The request path.
+        reason (str): 'header' if requested by the client, 'sampled' otherwise.
+    """
+
+    def __init__(self, path: str, reason: str) -> None:
+        self.profile_id = str(uuid4())
+        self.path = path
+        self.reason = reason
+        self._created = time.perf_counter()
+        self._marks: Dict[str, float] = {}
+        self._summary: Dict[str, Any] = {}
+        self._sampler = _StackSampler(settings.profiling_interval)
+
+    def start(self) -> None:
+        """Start sampling the calling (event loop) thread."""
+        self._sampler.add_thread(threading.get_ident(), "event-loop")
+        self._sampler.start()
+
+    def mark(self, name: str) -> None:
+        """
+        Record when the request reached a point.
+
+        Args:
+            name (str): 'generation_start', 'generation_end' or 'response_start'.
+        """
+        self._marks[name] = time.perf_counter()
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Wrap a function so its execution on a worker thread is profiled.
+
+        Args:
+            func (Callable[..., Any]): The function to run in the threadpool.
+
+        Returns:
+            Callable[..., Any]: The wrapped function.
+        """
+        submitted = time.perf_counter()
+
+        def profiled(*args, **kwargs):
+            started = time.perf_counter()
+            cpu_start = time.thread_time()
+            self._summary["queue_wait"] = started - submitted
+            self._sampler.add_thread(threading.get_ident(), "worker")
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._sampler.remove_thread(threading.get_ident())
+                self._summary["worker_wall"] = time.perf_counter() - started
+                self._summary["worker_cpu"] = time.thread_time() - cpu_start
+
+        return profiled
+
+    def finish(self, status_code: int) -> None:
+        """
+        Stop sampling and compute the phase durations.
+
+        Args:
+            status_code (int): The response status code.
+        """
+        finished = time.perf_counter()
+        self._sampler.stop()
+        self._summary["status_code"] = status_code
+        self._summary["total_wall"] = finished - self._created
+        # A request rejected by validation goes straight from 'request' to 'send';
+        # phases it never reached are omitted.
+        points = [
+            (
+                "request",
+                self._created,
+                self._marks.get("generation_start", self._marks.get("response_start")),
+            ),
+            (
+                "generation",
+                self._marks.get("generation_start"),
+                self._marks.get("generation_end"),
+            ),
+            (
+                "response",
+                self._marks.get("generation_end"),
+                self._marks.get("response_start"),
+            ),
+            ("send", self._marks.get("response_start"), finished),
+        ]
+        self._summary["phases"] = {
+            phase: end - begin
+            for phase, begin, end in points
+            if begin is not None and end is not None
+        }
+
+    def save(self) -> None:
+        """Write the profiles and summary to ``settings.profiling_dir``."""
+        profiles_dir = Path(settings.profiling_dir)
+        summary = {
+            "id": self.profile_id,
+            "path": self.path,
+            "reason": self.reason,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            **self._summary,
+        }
+        try:
+            profiles_dir.mkdir(parents=True, exist_ok=True)
+            for kind, counter in (
+                ("wall", self._sampler.wall),
+                ("cpu", self._sampler.cpu),
+            ):
+                # Folded stacks take integer weights; use microseconds.
+                lines = [
+                    f"{stack} {round(seconds * 1e6)}"
+                    for stack, seconds in counter.most_common()
+                    if seconds > 0
+                ]
+                (profiles_dir / f"{self.profile_id}.{kind}.folded").write_text(
+                    "\n".join(lines) + "\n", encoding="utf-8"
+                )
+            (profiles_dir / f"{self.profile_id}.json").write_text(
+                json.dumps(summary), encoding="utf-8"
+            )
+        except OSError as exc:
+            logger.error(f"Failed to save profile {self.profile_id}: {exc}")
+            return
+        logger.info(f"Saved profile {self.profile_id} for {self.path}")
+        _prune_profiles(profiles_dir)
+
+
+def _summaries_newest_first(profiles_dir: Path) -> List[Path]:
+    """
+    List the profile summary files, newest first.
+
+    Files deleted while listing (e.g. by a concurrent prune) are skipped.
+    """
+    summaries = []
+    for f in profiles_dir.glob("*.json"):
+        try:
+            summaries.append((f.stat().st_mtime, f))
+        except OSError:
+            continue
+    summaries.sort(key=lambda item: item[0], reverse=True)
+    return [f for _, f in summaries]
+
+
+def _prune_profiles(profiles_dir: Path) -> None:
+    """Delete the oldest profiles beyond ``settings.profiling_max_profiles``."""
+    for summary in _summaries_newest_first(profiles_dir)[
+        settings.profiling_max_profiles :
+    ]:
+        for f in profiles_dir.glob(f"{summary.stem}.*"):
+            try:
+                f.unlink(missing_ok=True)
+            except OSError as exc:
+                logger.error(f"Failed to delete profile file {f.name}: {exc}")
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """
+    Check a client-supplied admin token against ``settings.admin_token``.
+
+    Args:
+        token (Optional[str]): The X-Admin-Token header value.
+
+    Returns:
+        bool: True if an admin token is configured and ``token`` matches it.
+    """
+    if not settings.admin_token or token is None:
+        return False
+    return secrets.compare_digest(token.encode(), settings.admin_token.encode())
+
+
+def start_request_profile(headers: Headers, path: str) -> Optional[RequestProfile]:
+    """
+    Decide whether to profile a request.
+
+    Requests are profiled if profiling is enabled and the client sends a truthy
+    X-Profile header, or if they are sampled at ``settings.profiling_sample_rate``.
+    If ``settings.admin_token`` is set, X-Profile is only honoured together with a
+    matching X-Admin-Token header.
+
+    Args:
+        headers (Headers): The request headers.
+        path (str): The request path.
+
+    Returns:
+        Optional[RequestProfile]: A new profile, or None if the request is not profiled.
+    """
+    requested = headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes")
+    authorized = not settings.admin_token or is_admin_token(
+        headers.get(ADMIN_TOKEN_HEADER)
+    )
+    if settings.profiling_enabled and requested and authorized:
+        return RequestProfile(path, reason="header")
+    if (
+        settings.profiling_sample_rate > 0
+        and random.random() < settings.profiling_sample_rate
+    ):
+        return RequestProfile(path, reason="sampled")
+    return None
+
+
+def list_profiles() -> List[dict]:
+    """
+    List the stored profile summaries, newest first.
+
+    Returns:
+        List[dict]: The profile summaries.
+    """
+    profiles_dir = Path(settings.profiling_dir)
+    if not profiles_dir.exists():
+        return []
+    summaries = []
+    for f in _summaries_newest_first(profiles_dir):
+        try:
+            summaries.append(json.loads(f.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            continue  # Pruned since listing.
+        except (OSError, ValueError) as exc:
+            logger.error(f"Failed to read profile summary {f.name}: {exc}")
+    return summaries
+
+
+def get_profile_path(profile_id: str, kind: str) -> Optional[Path]:
+    """
+    Get the path of a stored profile.
+
+    Args:
+        profile_id (str): The profile identifier.
+        kind (str): 'wall' or 'cpu'.
+
+    Returns:
+        Optional[Path]: The folded-stack profile file, or None if it does not exist.
+    """
+    if kind not in PROFILE_KINDS:
+        return None
+    path = Path(settings.profiling_dir) / f"{profile_id}.{kind}.folded"
+    # Guard against path traversal through the identifier.
+    if path.parent.resolve() != Path(settings.profiling_dir).resolve():
+        return None
+    return path if path.is_file() else None
@@ -0,0 +1,98 @@
+"""
+Helpers for serving pre-serialized JSON responses with ETag-based conditional GET.
+"""
+
+import hashlib
+import threading
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response
+
+from twentyseven.config.settings import settings
+
+
+class PreSerializedJSON:
+    """
+    A JSON payload serialized once per version of its underlying data.
+
+    The payload is rebuilt only when the value returned by ``fingerprint_fn``
+    changes, so cached bytes and ETags are invalidated automatically when the
+    source data (files on disk, configured models, ...) is modified.
+
+    Attributes:
+        build_fn (Callable[[], Any]): Builds the JSON-serializable payload.
+        fingerprint_fn (Callable[[], Hashable]): Cheaply identifies the current data version.
+    """
+
+    def __init__(
+        self, build_fn: Callable[[], Any], fingerprint_fn: Callable[[], Hashable]
+    ) -> None:
+        self.build_fn = build_fn
+        self.fingerprint_fn = fingerprint_fn
+        self._lock = threading.Lock()
+        self._entry: Optional[Tuple[Hashable, bytes, str]] = None
+
+    def get(self) -> Tuple[bytes, str]:
+        """
+        Get the serialized payload and its ETag, rebuilding them if the data changed.
+
+        Returns:
+            Tuple[bytes, str]: The JSON body and its quoted ETag.
+        """
+        fingerprint = self.fingerprint_fn()
+        entry = self._entry
+        if entry is None or entry[0] != fingerprint:
+            with self._lock:
+                entry = self._entry
+                if entry is None or entry[0] != fingerprint:
+                    body = orjson.dumps(self.build_fn())
+                    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+                    entry = (fingerprint, body, etag)
+                    self._entry = entry
+        return entry[1], entry[2]
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check whether an If-None-Match header value matches an ETag (weak comparison).
+
+    Args:
+        if_none_match (str): The raw If-None-Match header value.
+        etag (str): The quoted ETag of the current representation.
+
+    Returns:
+        bool: True if the client already holds the current representation.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def conditional_json_response(request: Request, payload: PreSerializedJSON) -> Response:
+    """
+    Build a JSON response for a pre-serialized payload, honouring If-None-Match.
+
+    Args:
+        request (Request): The incoming request.
+        payload (PreSerializedJSON): The cached payload to serve.
+
+    Returns:
+        Response: A 304 response if the client's copy is current, otherwise a 200 with the body.
+    """
+    body, etag = payload.get()
+    if settings.http_cache_max_age > 0:
+        cache_control = f"public, max-age={settings.http_cache_max_age}"
+    else:
+        cache_control = "no-cache"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -2,7 +2,12 @@
 API router for generating answers and conclusions using language models.
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+from typing import Callable, Tuple, TypeVar
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 
 from twentyseven.app.models import (
     AnswerResponse,
@@ -11,56 +16,143 @@ from twentyseven.app.models import (
     QuestionRequest,
 )
 from twentyseven.config.logger import logger
+from twentyseven.lm.cancellation import CancellationToken, GenerationCancelled
+from twentyseven.lm.selection import ModelSelectionError
 from twentyseven.lm.utils import generate_answer, generate_conclusion
 
-router = APIRouter(prefix="/generator", tags=["generator"])
+router = APIRouter(
+    prefix="/generator", tags=["generator"], default_response_class=ORJSONResponse
+)
+
+T = TypeVar("T")
+
+# Seconds between checks for a disconnected client while a generation runs.
+_DISCONNECT_POLL_INTERVAL = 0.5
+
+
+async def _run_until_disconnected(
+    request: Request,
+    func: Callable[..., Tuple[str, T]],
+    *args,
+    **kwargs,
+) -> Tuple[str, T]:
+    """
+    Run a blocking generation in the threadpool, cancelling it if the client disconnects.
+
+    If the request is being profiled, the worker thread is sampled too and the
+    generation phase is marked in the profile.
+
+    Args:
+        request (Request): The incoming request, polled for disconnects.
+        func (Callable[..., Tuple[str, T]]): The generation function; must accept a ``cancel_token`` keyword.
+        *args: Positional arguments for ``func``.
+        **kwargs: Keyword arguments for ``func``.
+
+    Returns:
+        Tuple[str, T]: The generated text and its metadata.
+
+    Raises:
+        GenerationCancelled: If the client disconnected before the generation finished.
+    """
+    profile = getattr(request.state, "profile", None)
+    if profile is not None:
+        func = profile.wrap(func)
+        profile.mark("generation_start")
+    cancel_token = CancellationToken()
+    task = asyncio.ensure_future(
+        run_in_threadpool(func, *args, cancel_token=cancel_token, **kwargs)
+    )
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=_DISCONNECT_POLL_INTERVAL)
+            if done:
+                break
+            if await request.is_disconnected():
+                cancel_token.cancel()
+                break
+        return await task
+    finally:
+        if profile is not None:
+            profile.mark("generation_end")
 
 
 @router.post("/answer", response_model=AnswerResponse)
-def post_answer(req: QuestionRequest) -> AnswerResponse:
+async def post_answer(req: QuestionRequest, request: Request) -> AnswerResponse:
     """
     Generate an answer to a philosophical question from a given perspective and model.
 
+    The generation is cancelled if the client disconnects before it finishes.
+
     Args:
         req (QuestionRequest): The request body containing the question, perspective, and model name.
+        request (Request): The incoming request, used to detect client disconnects.
 
     Returns:
         AnswerResponse: The generated answer, perspective, and answer metadata.
 
     Raises:
-        HTTPException: 400 if question or perspective is missing, 500 for internal errors.
+        HTTPException: 400 if question or perspective is missing or no model meets
+            the selection constraints, 499 if the client disconnected, 500 for
+            internal errors.
     """
     if not req.question or not req.perspective:
         raise HTTPException(
             status_code=400, detail="Question and perspective are required."
         )
     try:
-        answer, metadata = generate_answer(req.question, req.perspective, req.model)
+        answer, metadata = await _run_until_disconnected(
+            request,
+            generate_answer,
+            req.question,
+            req.perspective,
+            req.model,
+            model_constraints=req.model_constraints,
+        )
         return AnswerResponse(
             perspective=req.perspective, answer=answer, metadata=metadata
         )
+    except GenerationCancelled as exc:
+        raise HTTPException(status_code=499, detail="Client closed request.") from exc
+    except ModelSelectionError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
         logger.error(f"Error generating answer: {exc}")
         raise HTTPException(status_code=500, detail="Error generating answer.") from exc
 
 
 @router.post("/conclusion", response_model=ConclusionResponse)
-def post_conclusion(req: ConclusionRequest) -> ConclusionResponse:
+async def post_conclusion(
+    req: ConclusionRequest, request: Request
+) -> ConclusionResponse:
     """
     Generate a conclusion based on multiple answers and a model.
 
+    The generation is cancelled if the client disconnects before it finishes.
+
     Args:
         req (ConclusionRequest): The request body containing a dictionary of answers and the model name.
+        request (Request): The incoming request, used to detect client disconnects.
 
     Returns:
         ConclusionResponse: The generated conclusion and conclusion metadata.
 
     Raises:
-        HTTPException: 500 for internal errors during conclusion generation.
+        HTTPException: 400 if no model meets the selection constraints, 499 if the
+            client disconnected, 500 for internal errors during conclusion generation.
     """
     try:
-        conclusion, metadata = generate_conclusion(req.answers, req.model)
+        conclusion, metadata = await _run_until_disconnected(
+            request,
+            generate_conclusion,
+            req.answers,
+            req.model,
+            model_constraints=req.model_constraints,
+        )
         return ConclusionResponse(conclusion=conclusion, metadata=metadata)
+    except GenerationCancelled as exc:
+        raise HTTPException(status_code=499, detail="Client closed request.") from exc
+    except ModelSelectionError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
         logger.error(f"Error generating conclusion: {exc}")
         raise HTTPException(
@@ -2,12 +2,17 @@
 API router for listing available model names from different providers.
 """
 
-from typing import List
+from typing import Dict, List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 
+from twentyseven.app.models import ModelStatus
+from twentyseven.app.responses import PreSerializedJSON, conditional_json_response
 from twentyseven.config.logger import logger
 from twentyseven.config.settings import settings
+from twentyseven.lm.local_models import local_model_registry
+from twentyseven.lm.performance import model_performance
+from twentyseven.lm.selection import auto_model_name
 
 router = APIRouter(prefix="/models", tags=["models"])
 
@@ -27,7 +32,7 @@ def list_models(provider: str) -> List[str]:
     """
     try:
         if provider == "local":
-            return settings.local_models
+            return local_model_registry.list_models()
         elif provider == "openrouter":
             return settings.external_models["openrouter"]
         else:
@@ -39,12 +44,60 @@ def list_models(provider: str) -> List[str]:
                     f"Valid providers are: {valid_providers}."
                 ),
             )
+    except HTTPException:
+        raise
     except Exception as exc:
         logger.error(f"Error listing models: {exc}")
         raise HTTPException(status_code=500, detail="Error listing models.") from exc
 
 
+def _models_payload(provider: str) -> PreSerializedJSON:
+    """Build a pre-serialized model list, ending in 'auto:<provider>', fingerprinted by the list itself."""
+    return PreSerializedJSON(
+        build_fn=lambda: list_models(provider) + [auto_model_name(provider)],
+        fingerprint_fn=lambda: tuple(list_models(provider)),
+    )
+
+
+# Serialized once per version of each provider's model list.
+_models_payloads: Dict[str, PreSerializedJSON] = {
+    "local": _models_payload("local"),
+    "openrouter": _models_payload("openrouter"),
+}
+
+
 @router.get("/models", response_model=List[str])
-def get_models(provider: str) -> List[str]:
+def get_models(provider: str, request: Request) -> Response:
     """FastAPI endpoint for listing models."""
-    return list_models(provider)
+    payload = _models_payloads.get(provider)
+    if payload is None:
+        # Unknown provider: let list_models raise the appropriate 400.
+        list_models(provider)
+    return conditional_json_response(request, payload)
+
+
+@router.get("/status", response_model=List[ModelStatus])
+def get_models_status(provider: str) -> List[ModelStatus]:
+    """FastAPI endpoint for listing models with their warm/cold state."""
+    models = list_models(provider)
+    if provider == "local":
+        return [
+            ModelStatus(
+                name=name,
+                provider=provider,
+                state="warm" if local_model_registry.is_warm(name) else "cold",
+            )
+            for name in models
+        ]
+    return [
+        ModelStatus(name=name, provider=provider, state="remote") for name in models
+    ]
+
+
+@router.get("/performance")
+def get_models_performance() -> Dict[str, dict]:
+    """FastAPI endpoint for the rolling per-model performance table used by 'auto' selection."""
+    return {
+        name: {**stats, "cost_per_token": settings.model_cost_per_token.get(name, 0.0)}
+        for name, stats in model_performance.table().items()
+    }
@@ -4,26 +4,38 @@ API router for retrieving available philosophical perspectives.
 
 from typing import Dict
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 
-from twentyseven.app.utils import get_perspectives
+from twentyseven.app.responses import PreSerializedJSON, conditional_json_response
+from twentyseven.app.utils import get_perspectives, get_perspectives_fingerprint
 from twentyseven.config.logger import logger
 
 router = APIRouter(prefix="/perspectives", tags=["perspectives"])
 
+# Serialized once per version of the perspective files on disk.
+_perspectives_payload = PreSerializedJSON(
+    build_fn=get_perspectives, fingerprint_fn=get_perspectives_fingerprint
+)
 
-def get_perspectives_endpoint() -> Dict[str, str]:
+
+def get_perspectives_endpoint(request: Request) -> Response:
     """
     Retrieve the available philosophical perspectives.
 
+    The response body is pre-serialized and carries an ETag, so clients sending
+    a matching If-None-Match header receive a 304 without a body.
+
+    Args:
+        request (Request): The incoming request.
+
     Returns:
-        Dict[str, str]: A dictionary mapping perspective keys to their descriptions.
+        Response: JSON mapping perspective keys to their descriptions, or a 304.
 
     Raises:
         HTTPException: 500 if perspectives cannot be loaded.
     """
     try:
-        return get_perspectives()
+        return conditional_json_response(request, _perspectives_payload)
     except Exception as exc:
         logger.error(f"Error loading perspectives: {exc}")
         raise HTTPException(
@@ -32,6 +44,6 @@ def get_perspectives_endpoint() -> Dict[str, str]:
 
 
 @router.get("/perspectives", response_model=Dict[str, str])
-def get_perspectives_route() -> Dict[str, str]:
+def get_perspectives_route(request: Request) -> Response:
     """FastAPI endpoint for retrieving perspectives."""
-    return get_perspectives_endpoint()
+    return get_perspectives_endpoint(request)
@@ -2,10 +2,15 @@
 API router for system health and configuration checks.
 """
 
+from typing import List, Optional
+
 import requests
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
 
+from twentyseven.app.profiling import get_profile_path, is_admin_token, list_profiles
 from twentyseven.config.settings import settings
+from twentyseven.lm.cancellation import cancellation_stats
 
 router = APIRouter(prefix="/system", tags=["system"])
 
@@ -28,3 +33,45 @@ def get_check_api_keys() -> dict:
     return {
         "openrouter": bool(settings.openrouter_api_key),
     }
+
+
+@router.get("/cancellations")
+def get_cancellations() -> dict:
+    """FastAPI endpoint for reporting work cancelled after client disconnects."""
+    return cancellation_stats.snapshot()
+
+
+def _require_profile_access(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Restrict access to stored request profiles.
+
+    If ``settings.admin_token`` is set, the X-Admin-Token header must match it.
+    Otherwise profiles are only readable while ``settings.profiling_enabled`` is on.
+
+    Args:
+        x_admin_token (Optional[str]): The X-Admin-Token request header.
+
+    Raises:
+        HTTPException: 403 if the token is missing or wrong, 404 if profiling is
+            disabled and no token is configured.
+    """
+    if settings.admin_token:
+        if not is_admin_token(x_admin_token):
+            raise HTTPException(status_code=403, detail="Invalid admin token.")
+    elif not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled.")
+
+
+@router.get("/profiles", dependencies=[Depends(_require_profile_access)])
+def get_profiles() -> List[dict]:
+    """FastAPI endpoint for listing stored request profile summaries, newest first."""
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(_require_profile_access)])
+def get_profile(profile_id: str, kind: str = "wall") -> FileResponse:
+    """FastAPI endpoint for downloading a request profile ('wall' or 'cpu') in folded-stack format."""
+    path = get_profile_path(profile_id, kind)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return FileResponse(path, media_type="text/plain", filename=path.name)
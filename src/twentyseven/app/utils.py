@@ -3,7 +3,7 @@ Utility functions for the API application.
 """
 
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Tuple
 
 from twentyseven.config.logger import logger
 from twentyseven.config.settings import settings
@@ -38,3 +38,24 @@ def get_perspectives() -> Dict[str, str]:
             perspectives[name] = summary
     logger.info(f"Loaded {len(perspectives)} perspectives.")
     return dict(sorted(perspectives.items()))
+
+
+def get_perspectives_fingerprint() -> Tuple[Tuple[str, int, int], ...]:
+    """
+    Get a cheap fingerprint of the perspective files, used to detect changes on disk.
+
+    Returns:
+        Tuple[Tuple[str, int, int], ...]: (filename, mtime_ns, size) for each .txt file, sorted by name.
+            Empty if the perspectives directory does not exist.
+    """
+    perspectives_dir = Path(settings.perspectives_dir)
+    if not perspectives_dir.exists():
+        return ()
+    fingerprint = []
+    for f in perspectives_dir.glob("*.txt"):
+        try:
+            stat = f.stat()
+        except OSError:
+            continue
+        fingerprint.append((f.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(fingerprint))
@@ -4,8 +4,9 @@ Application settings management.
 
 from pathlib import Path
 from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
 
-from pydantic import Field, field_validator
+from pydantic import Field, ValidationInfo, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -26,6 +27,23 @@ class Settings(BaseSettings):
         default="http://localhost:1234/v1/chat/completions",
         description="Base URL for the local LLM API endpoint.",
     )
+    lm_studio_models_endpoint: Optional[str] = Field(
+        default=None,
+        validate_default=True,
+        description="URL of the local LLM API model listing, used for live model discovery. Defaults to /api/v0/models on the lm_studio_endpoint server, which reports model type and load state.",
+    )
+
+    @field_validator("lm_studio_models_endpoint")
+    @classmethod
+    def resolve_lm_studio_models_endpoint(
+        cls, v: Optional[str], info: ValidationInfo
+    ) -> str:
+        """Default the model listing to the same server as lm_studio_endpoint."""
+        if v:
+            return v
+        parts = urlsplit(info.data.get("lm_studio_endpoint", ""))
+        return urlunsplit((parts.scheme, parts.netloc, "/api/v0/models", "", ""))
+
     openrouter_endpoint: str = Field(
         default="https://openrouter.ai/api/v1/chat/completions",
         description="Base URL for OpenRouter API endpoint.",
@@ -54,6 +72,33 @@ class Settings(BaseSettings):
     max_words_conclusion: int = Field(
         default=256, description="Maximum number of words for a generated conclusion."
     )
+    stream_generation: bool = Field(
+        default=True,
+        description="Stream completions and stop generating once the word limit is reached at a sentence boundary.",
+    )
+    default_tokens_per_word: float = Field(
+        default=1.4,
+        description="Assumed tokens per word for models without observed statistics.",
+    )
+    default_reasoning_tokens: int = Field(
+        default=512,
+        description="Assumed reasoning (think) tokens for unobserved models listed in reasoning_models.",
+    )
+    reasoning_models: List[str] = Field(
+        default_factory=lambda: [
+            "deepseek/deepseek-r1-0528-qwen3-8b",
+            "mistralai/magistral-small",
+        ],
+        description="Models known to emit a reasoning (think) section. Other models start with no reasoning overhead and learn it from usage.",
+    )
+    token_budget_margin: float = Field(
+        default=0.2,
+        description="Fractional margin added to the visible-word token budget to finish the last sentence.",
+    )
+    max_tokens_ceiling: int = Field(
+        default=4096,
+        description="Upper bound on max_tokens for any single generation.",
+    )
     openrouter_api_key: Optional[str] = Field(
         default=None,
         description="API key for OpenRouter API. Required for external model integration.",
@@ -66,10 +111,86 @@ class Settings(BaseSettings):
         ],
         description="List of locally available LLM model names.",
     )
+    local_models_cache_ttl: float = Field(
+        default=30.0,
+        description="Seconds between refreshes of the discovered local model list.",
+    )
+    local_models_warm_ttl: float = Field(
+        default=3600.0,
+        description="Seconds a local model is assumed to stay loaded after a generation, when the server does not report load state.",
+    )
+    warmup_models: List[str] = Field(
+        default_factory=list,
+        description="Local models to preload with a tiny completion at app startup.",
+    )
+    warmup_timeout: float = Field(
+        default=300.0,
+        description="Timeout in seconds for warming up a single local model (includes model load time).",
+    )
+    performance_window: int = Field(
+        default=100,
+        description="Number of recent generations per model kept for latency/throughput/error statistics.",
+    )
+    performance_error_ttl: float = Field(
+        default=300.0,
+        description="Seconds a failed generation counts towards a model's error rate in automatic selection.",
+    )
+    model_cost_per_token: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Cost per output token (e.g. USD) by model name, used by automatic model selection. Unlisted models cost 0.",
+    )
+    model_quality_tiers: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Quality tier by model name (higher is better), used by automatic model selection. Unlisted models are tier 0.",
+    )
+    auto_default_tokens_per_second: float = Field(
+        default=30.0,
+        description="Assumed generation throughput for models without observed statistics.",
+    )
+    auto_cold_start_penalty: float = Field(
+        default=15.0,
+        description="Seconds added to the estimated latency of cold local models.",
+    )
+    auto_max_error_rate: float = Field(
+        default=0.5,
+        description="Models with a higher recent error rate are excluded from automatic selection.",
+    )
+    profiling_enabled: bool = Field(
+        default=False,
+        description="Allow clients to request profiling of generator requests with an 'X-Profile: 1' header.",
+    )
+    profiling_sample_rate: float = Field(
+        default=0.0,
+        description="Fraction of generator requests profiled automatically (0 disables sampling).",
+    )
+    profiling_interval: float = Field(
+        default=0.005,
+        description="Seconds between stack samples of a profiled request.",
+    )
+    profiling_dir: str = Field(
+        default=".profiles",
+        description="Directory where request profiles are stored.",
+    )
+    profiling_max_profiles: int = Field(
+        default=100,
+        description="Maximum number of request profiles kept on disk; older ones are deleted.",
+    )
+    admin_token: Optional[str] = Field(
+        default=None,
+        description="Token required in the X-Admin-Token header to read request profiles.",
+    )
     temperature: float = Field(
         default=0.7,
         description="Default temperature for LLM generation (controls randomness).",
     )
+    compression_minimum_size: int = Field(
+        default=1024,
+        description="Minimum response body size (bytes) before gzip/brotli compression is applied.",
+    )
+    http_cache_max_age: int = Field(
+        default=0,
+        description="Seconds clients may reuse cached read-mostly responses before revalidating with ETag (0 = always revalidate).",
+    )
 
     @property
     def external_models(self) -> Dict[str, List[str]]:
@@ -0,0 +1,107 @@
+"""
+Adaptive output-token budgeting based on observed per-model generation statistics.
+"""
+
+import math
+import threading
+from typing import Dict, Tuple
+
+from twentyseven.config.settings import settings
+
+# Weight of the newest observation in the exponential moving averages.
+_EMA_ALPHA = 0.3
+# Extra room given on top of the average reasoning length, which varies a lot per prompt.
+_REASONING_HEADROOM = 1.5
+_MIN_MAX_TOKENS = 64
+
+
+class TokenBudget:
+    """
+    Per-model estimates of tokens-per-word and reasoning overhead, used to size max_tokens.
+
+    Until a model has been observed, ``settings.default_tokens_per_word`` is used,
+    and ``settings.default_reasoning_tokens`` of reasoning overhead is assumed only
+    for models listed in ``settings.reasoning_models``. Other models start without
+    reasoning headroom, so non-reasoning models are not over-budgeted.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # model name -> (tokens per word, reasoning tokens)
+        self._stats: Dict[str, Tuple[float, float]] = {}
+
+    def _estimates(self, model_name: str) -> Tuple[float, float]:
+        """Get a model's (tokens per word, reasoning tokens), falling back to defaults."""
+        with self._lock:
+            stats = self._stats.get(model_name)
+        if stats is not None:
+            return stats
+        reasoning_tokens = 0.0
+        if model_name in settings.reasoning_models:
+            reasoning_tokens = float(settings.default_reasoning_tokens)
+        return settings.default_tokens_per_word, reasoning_tokens
+
+    def max_tokens(self, model_name: str, word_limit: int) -> int:
+        """
+        Compute the output-token budget for a call.
+
+        Args:
+            model_name (str): The model to generate with.
+            word_limit (int): The maximum number of visible words requested.
+
+        Returns:
+            int: The max_tokens value to send to the provider.
+        """
+        tokens_per_word, reasoning_tokens = self._estimates(model_name)
+        visible = word_limit * tokens_per_word * (1 + settings.token_budget_margin)
+        budget = math.ceil(visible + reasoning_tokens * _REASONING_HEADROOM)
+        return max(_MIN_MAX_TOKENS, min(budget, settings.max_tokens_ceiling))
+
+    def expected_tokens(self, model_name: str, word_limit: int) -> float:
+        """
+        Estimate how many tokens a call will actually generate, including reasoning.
+
+        Args:
+            model_name (str): The model to generate with.
+            word_limit (int): The maximum number of visible words requested.
+
+        Returns:
+            float: The expected number of completion tokens.
+        """
+        tokens_per_word, reasoning_tokens = self._estimates(model_name)
+        return word_limit * tokens_per_word + reasoning_tokens
+
+    def record(
+        self,
+        model_name: str,
+        completion_tokens: int,
+        visible_words: int,
+        reasoning_words: int,
+    ) -> None:
+        """
+        Update a model's estimates from a finished generation.
+
+        Args:
+            model_name (str): The model that generated the text.
+            completion_tokens (int): Tokens generated, including reasoning.
+            visible_words (int): Words in the visible answer.
+            reasoning_words (int): Words in the reasoning (think) section.
+        """
+        total_words = visible_words + reasoning_words
+        if completion_tokens <= 0 or total_words <= 0:
+            return
+        tokens_per_word = completion_tokens / total_words
+        reasoning_tokens = reasoning_words * tokens_per_word
+        with self._lock:
+            previous = self._stats.get(model_name)
+            if previous is not None:
+                tokens_per_word = (
+                    _EMA_ALPHA * tokens_per_word + (1 - _EMA_ALPHA) * previous[0]
+                )
+                reasoning_tokens = (
+                    _EMA_ALPHA * reasoning_tokens + (1 - _EMA_ALPHA) * previous[1]
+                )
+            self._stats[model_name] = (tokens_per_word, reasoning_tokens)
+
+
+token_budget = TokenBudget()
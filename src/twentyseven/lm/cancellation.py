@@ -0,0 +1,131 @@
+"""
+Cancellation of in-flight generations whose client has gone away.
+"""
+
+import threading
+from typing import Callable, List
+
+from twentyseven.config.logger import logger
+
+
+class GenerationCancelled(Exception):
+    """Raised when a generation is cancelled because its client disconnected."""
+
+
+def _run_callback(callback: Callable[[], None]) -> None:
+    """Run a cancellation callback, logging rather than propagating its errors."""
+    try:
+        callback()
+    except Exception as exc:
+        logger.warning(f"Cancellation callback failed: {exc}")
+
+
+class CancellationToken:
+    """
+    Thread-safe flag shared between a request handler and the worker generating for it.
+
+    Callbacks registered with ``add_callback`` run when the token is cancelled, so a
+    worker blocked on I/O can be interrupted instead of only checking the flag.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    def cancel(self) -> None:
+        """Request cancellation of the associated generation and run the registered callbacks."""
+        with self._lock:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            _run_callback(callback)
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Register a callback to run on cancellation, or run it now if already cancelled.
+
+        Args:
+            callback (Callable[[], None]): The callback; it runs on the cancelling thread.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        _run_callback(callback)
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        """Unregister a callback that has not run yet."""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation has been requested."""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raise if cancellation has been requested.
+
+        Raises:
+            GenerationCancelled: If the token has been cancelled.
+        """
+        if self._event.is_set():
+            raise GenerationCancelled("Client disconnected")
+
+
+class CancellationStats:
+    """
+    Counters of work cancelled after client disconnects.
+
+    Attributes:
+        skipped (int): Generations cancelled before the upstream call was made.
+        aborted (int): Streaming generations aborted mid-way by closing the upstream connection.
+        abandoned (int): Non-streaming generations that could not be interrupted and ran to completion.
+        unused_token_budget (int): Output tokens reserved (max_tokens) but never generated
+            by skipped or aborted generations.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.skipped = 0
+        self.aborted = 0
+        self.abandoned = 0
+        self.unused_token_budget = 0
+
+    def record_skipped(self, token_budget: int) -> None:
+        """Record a generation cancelled before reaching the upstream server."""
+        with self._lock:
+            self.skipped += 1
+            self.unused_token_budget += token_budget
+
+    def record_aborted(self, token_budget: int, generated_tokens: int) -> None:
+        """Record a streaming generation aborted after ``generated_tokens`` tokens."""
+        with self._lock:
+            self.aborted += 1
+            self.unused_token_budget += max(0, token_budget - generated_tokens)
+
+    def record_abandoned(self) -> None:
+        """Record a generation whose result was discarded because its client left."""
+        with self._lock:
+            self.abandoned += 1
+
+    def snapshot(self) -> dict:
+        """
+        Get the current counter values.
+
+        Returns:
+            dict: The counters keyed by name.
+        """
+        with self._lock:
+            return {
+                "skipped": self.skipped,
+                "aborted": self.aborted,
+                "abandoned": self.abandoned,
+                "unused_token_budget": self.unused_token_budget,
+            }
+
+
+cancellation_stats = CancellationStats()
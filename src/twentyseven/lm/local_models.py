@@ -0,0 +1,221 @@
+"""
+Discovery and warm-up of models served by the local LM Studio instance.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from twentyseven.config.logger import logger
+from twentyseven.config.settings import settings
+
+
+def _is_chat_model(entry: dict) -> bool:
+    """
+    Check whether a model listing entry can serve chat completions.
+
+    Args:
+        entry (dict): One entry of the model listing.
+
+    Returns:
+        bool: False for embedding models, True otherwise.
+    """
+    if "type" in entry:
+        # LM Studio types: "llm", "vlm", "embeddings".
+        return entry["type"] in ("llm", "vlm")
+    # OpenAI-compatible listings have no type; fall back to the naming convention.
+    return "embed" not in entry["id"].lower()
+
+
+class LocalModelRegistry:
+    """
+    Cached view of the models available on the local endpoint and their warm/cold state.
+
+    Chat-capable models are discovered from ``settings.lm_studio_models_endpoint``
+    (LM Studio's ``/api/v0/models`` REST listing, which reports each model's type and
+    load state) and cached for ``settings.local_models_cache_ttl`` seconds. A
+    background thread keeps the cache fresh once started; without it, stale reads
+    trigger a synchronous refresh. If the endpoint cannot be reached, the configured
+    ``settings.local_models`` are used.
+
+    A model is considered warm if the server reports it as loaded. When the server
+    does not report load state (e.g. a plain OpenAI-compatible ``/v1/models``), a
+    model is warm if it completed a generation in this process within the last
+    ``settings.local_models_warm_ttl`` seconds.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._available: Optional[List[str]] = None
+        self._loaded: Dict[str, bool] = {}
+        self._fetched_at = 0.0
+        # model name -> monotonic time of its last completed generation
+        self._warm: Dict[str, float] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> None:
+        """
+        Fetch the model listing from the local endpoint and update the cache.
+
+        Failures are logged and leave the previous cache in place.
+        """
+        try:
+            resp = requests.get(settings.lm_studio_models_endpoint, timeout=2)
+            resp.raise_for_status()
+            entries = resp.json().get("data", [])
+        except (requests.RequestException, ValueError) as exc:
+            logger.warning(f"Local model discovery failed: {exc}")
+            with self._lock:
+                self._fetched_at = time.monotonic()
+            return
+
+        available = []
+        loaded = {}
+        for entry in entries:
+            model_id = entry.get("id")
+            if not model_id:
+                continue
+            if not _is_chat_model(entry):
+                continue
+            available.append(model_id)
+            # LM Studio reports "loaded" / "not-loaded"; plain OpenAI servers omit it.
+            if "state" in entry:
+                loaded[model_id] = entry["state"] == "loaded"
+        with self._lock:
+            self._available = available
+            self._loaded = loaded
+            self._fetched_at = time.monotonic()
+        logger.info(f"Discovered {len(available)} local models.")
+
+    def _ensure_fresh(self) -> None:
+        """Refresh synchronously if the cache is empty or stale and no refresher runs."""
+        if self._thread is not None:
+            return
+        age = time.monotonic() - self._fetched_at
+        if self._fetched_at == 0.0 or age > settings.local_models_cache_ttl:
+            self.refresh()
+
+    def list_models(self) -> List[str]:
+        """
+        List the model names available on the local endpoint.
+
+        Returns:
+            List[str]: Discovered model names, or the configured local models if
+                discovery has not succeeded.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            if self._available is None:
+                return list(settings.local_models)
+            return list(self._available)
+
+    def is_warm(self, model_name: str) -> bool:
+        """
+        Check whether a local model is loaded and ready to generate.
+
+        Args:
+            model_name (str): The model name.
+
+        Returns:
+            bool: True if the model is known to be loaded.
+        """
+        with self._lock:
+            if model_name in self._loaded:
+                return self._loaded[model_name]
+            last_used = self._warm.get(model_name)
+        if last_used is None:
+            return False
+        # Servers unload idle models, so an old generation says nothing about now.
+        return time.monotonic() - last_used < settings.local_models_warm_ttl
+
+    def mark_warm(self, model_name: str) -> None:
+        """
+        Record that a model has just completed a generation and is therefore loaded.
+
+        Args:
+            model_name (str): The model name.
+        """
+        with self._lock:
+            self._warm[model_name] = time.monotonic()
+            if model_name in self._loaded:
+                self._loaded[model_name] = True
+
+    def start(self) -> None:
+        """Start the background refresh thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop, name="local-model-discovery", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _refresh_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self.refresh()
+            self._stop_event.wait(settings.local_models_cache_ttl)
+
+
+local_model_registry = LocalModelRegistry()
+
+
+def warm_up_models(model_names: Iterable[str]) -> None:
+    """
+    Preload local models by sending each a tiny completion, one at a time.
+
+    Args:
+        model_names (Iterable[str]): The local models to warm up.
+    """
+    for model_name in model_names:
+        start = time.monotonic()
+        payload = {
+            "model": model_name,
+            "messages": [{"role": "user", "content": "Hi"}],
+            "temperature": 0,
+            "max_tokens": 1,
+        }
+        try:
+            resp = requests.post(
+                settings.lm_studio_endpoint,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=settings.warmup_timeout,
+            )
+            resp.raise_for_status()
+        except requests.RequestException as exc:
+            logger.warning(f"Warm-up of model {model_name} failed: {exc}")
+            continue
+        local_model_registry.mark_warm(model_name)
+        logger.info(f"Warmed up model {model_name} in {time.monotonic() - start:.1f}s")
+    # Pick up the new load states reported by the server.
+    local_model_registry.refresh()
+
+
+def start_warm_up(model_names: Iterable[str]) -> Optional[threading.Thread]:
+    """
+    Warm up local models in a background thread so startup is not blocked.
+
+    Args:
+        model_names (Iterable[str]): The local models to warm up.
+
+    Returns:
+        Optional[threading.Thread]: The warm-up thread, or None if there is nothing to warm up.
+    """
+    model_names = list(model_names)
+    if not model_names:
+        return None
+    thread = threading.Thread(
+        target=warm_up_models, args=(model_names,), name="model-warm-up", daemon=True
+    )
+    thread.start()
+    return thread
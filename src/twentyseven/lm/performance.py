@@ -0,0 +1,110 @@
+"""
+Rolling per-model performance statistics collected from live traffic.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from twentyseven.config.settings import settings
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ModelPerformance:
+    """
+    Rolling window of generation outcomes per model.
+
+    Each sample is (monotonic timestamp, latency in seconds, completion tokens,
+    success). Completion tokens are None when the server reported no usage (e.g. a
+    stream stopped early); such samples count towards latency and error rate but
+    not throughput. Only the latest ``settings.performance_window`` samples per model are
+    kept. Error rates only count samples from the last
+    ``settings.performance_error_ttl`` seconds, so a model excluded for failing
+    becomes eligible again once its failures age out.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[Tuple[float, float, Optional[int], bool]]] = {}
+
+    def record(
+        self,
+        model_name: str,
+        latency: float,
+        completion_tokens: Optional[int],
+        ok: bool,
+    ) -> None:
+        """
+        Record the outcome of a generation.
+
+        Args:
+            model_name (str): The model used.
+            latency (float): Wall-clock duration of the upstream call in seconds.
+            completion_tokens (Optional[int]): Server-reported tokens generated (0 for
+                failures), or None if not reported.
+            ok (bool): Whether the generation succeeded.
+        """
+        with self._lock:
+            samples = self._samples.get(model_name)
+            if samples is None:
+                samples = deque(maxlen=settings.performance_window)
+                self._samples[model_name] = samples
+            samples.append((time.monotonic(), latency, completion_tokens, ok))
+
+    def stats(self, model_name: str) -> Optional[dict]:
+        """
+        Summarize a model's recent performance.
+
+        Args:
+            model_name (str): The model name.
+
+        Returns:
+            Optional[dict]: Sample count, p50/p95 latency (s), tokens per second and
+                recent error rate, or None if the model has no samples. Latency figures
+                and throughput are None if no generation succeeded with reported usage.
+        """
+        with self._lock:
+            samples = list(self._samples.get(model_name, ()))
+        if not samples:
+            return None
+        successes = [(lat, tokens) for _, lat, tokens, ok in samples if ok]
+        cutoff = time.monotonic() - settings.performance_error_ttl
+        recent = [ok for timestamp, _, _, ok in samples if timestamp >= cutoff]
+        stats = {
+            "samples": len(samples),
+            "error_rate": 1 - sum(recent) / len(recent) if recent else 0.0,
+            "p50_latency": None,
+            "p95_latency": None,
+            "tokens_per_second": None,
+        }
+        if successes:
+            latencies = sorted(lat for lat, _ in successes)
+            stats["p50_latency"] = _percentile(latencies, 0.5)
+            stats["p95_latency"] = _percentile(latencies, 0.95)
+        counted = [(lat, tokens) for lat, tokens in successes if tokens is not None]
+        counted_latency = sum(lat for lat, _ in counted)
+        if counted_latency > 0:
+            stats["tokens_per_second"] = (
+                sum(tokens for _, tokens in counted) / counted_latency
+            )
+        return stats
+
+    def table(self) -> Dict[str, dict]:
+        """
+        Summarize all observed models.
+
+        Returns:
+            Dict[str, dict]: Stats keyed by model name.
+        """
+        with self._lock:
+            model_names = list(self._samples)
+        return {name: self.stats(name) for name in model_names}
+
+
+model_performance = ModelPerformance()
@@ -0,0 +1,212 @@
+"""
+Latency- and cost-aware automatic model selection.
+"""
+
+from typing import List, Optional, Tuple
+
+from twentyseven.app.models import ModelConstraints
+from twentyseven.config.settings import settings
+from twentyseven.lm.budget import token_budget
+from twentyseven.lm.local_models import local_model_registry
+from twentyseven.lm.performance import model_performance
+
+AUTO_MODEL = "auto"
+AUTO_PROVIDERS = ("local", "openrouter")
+
+
+class ModelSelectionError(ValueError):
+    """Raised when no model can satisfy a request's selection constraints."""
+
+
+def auto_model_name(provider: str) -> str:
+    """
+    Get the model name that selects automatically among one provider's models.
+
+    Args:
+        provider (str): The provider, e.g. 'local'.
+
+    Returns:
+        str: The provider-scoped automatic model name, e.g. 'auto:local'.
+    """
+    return f"{AUTO_MODEL}:{provider}"
+
+
+def parse_auto_model(model_name: str) -> Tuple[bool, Optional[str]]:
+    """
+    Check whether a model name requests automatic selection.
+
+    Args:
+        model_name (str): The requested model name.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether selection is automatic, and the provider it
+            is limited to ('auto:<provider>'), or None for 'auto' across all providers.
+
+    Raises:
+        ModelSelectionError: If the name is 'auto:' followed by an unknown provider.
+    """
+    if model_name == AUTO_MODEL:
+        return True, None
+    prefix, sep, provider = model_name.partition(":")
+    if prefix != AUTO_MODEL or not sep:
+        return False, None
+    if provider not in AUTO_PROVIDERS:
+        raise ModelSelectionError(
+            f"Unknown provider '{provider}' for automatic selection. "
+            f"Valid providers are: {list(AUTO_PROVIDERS)}."
+        )
+    return True, provider
+
+
+def _candidate_models(provider: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    List the chat models automatic selection may choose from.
+
+    Local models come from the registry, which excludes embedding models.
+
+    Args:
+        provider (Optional[str]): Limit candidates to this provider; None allows all.
+
+    Returns:
+        List[Tuple[str, str]]: (model name, provider) pairs. OpenRouter models are
+            only included if an API key is configured.
+    """
+    candidates = []
+    if provider in (None, "local"):
+        candidates = [(name, "local") for name in local_model_registry.list_models()]
+    if provider in (None, "openrouter") and settings.openrouter_api_key:
+        local_names = {name for name, _ in candidates}
+        candidates.extend(
+            (name, "openrouter")
+            for name in settings.external_models["openrouter"]
+            if name not in local_names
+        )
+    return candidates
+
+
+def _estimate(model_name: str, provider: str, word_limit: int) -> dict:
+    """
+    Estimate latency and cost of a generation with a given model.
+
+    Args:
+        model_name (str): The model name.
+        provider (str): The model's provider.
+        word_limit (int): The maximum number of visible words requested.
+
+    Returns:
+        dict: Estimated latency (s), cost, quality tier, recent error rate and
+            whether observed statistics were available.
+    """
+    stats = model_performance.stats(model_name)
+    tokens_per_second = settings.auto_default_tokens_per_second
+    if stats is not None and stats["tokens_per_second"]:
+        tokens_per_second = stats["tokens_per_second"]
+    latency = token_budget.expected_tokens(model_name, word_limit) / tokens_per_second
+    if provider == "local" and not local_model_registry.is_warm(model_name):
+        latency += settings.auto_cold_start_penalty
+    cost_per_token = settings.model_cost_per_token.get(model_name, 0.0)
+    return {
+        "latency": latency,
+        "cost": cost_per_token * token_budget.max_tokens(model_name, word_limit),
+        "quality_tier": settings.model_quality_tiers.get(model_name, 0),
+        "error_rate": stats["error_rate"] if stats is not None else 0.0,
+        "observed": stats is not None,
+    }
+
+
+def select_model(
+    word_limit: int,
+    constraints: Optional[ModelConstraints] = None,
+    provider: Optional[str] = None,
+) -> Tuple[str, dict]:
+    """
+    Pick the best model for a single generation within the given constraints.
+
+    Models below the minimum quality tier are excluded, as are models whose recent
+    error rate exceeds ``settings.auto_max_error_rate`` unless every model does.
+    The rest are ranked by the preferred objective, then by quality tier and the
+    configured model order, and the best one within the latency and cost limits
+    is chosen.
+
+    Args:
+        word_limit (int): The maximum number of visible words requested, which
+            makes answers and conclusions estimate differently.
+        constraints (Optional[ModelConstraints]): The request's selection constraints.
+        provider (Optional[str]): Only choose among this provider's models; None
+            allows all providers.
+
+    Returns:
+        Tuple[str, dict]: The selected model name and selection details for metadata.
+
+    Raises:
+        ModelSelectionError: If no model is available, or none meets the quality
+            tier or the latency and cost limits.
+    """
+    constraints = constraints or ModelConstraints()
+    candidates = _candidate_models(provider)
+    if not candidates:
+        raise ModelSelectionError(
+            f"No {provider or 'configured'} models available for automatic selection"
+        )
+    qualified = []
+    for model_name, model_provider in candidates:
+        estimate = _estimate(model_name, model_provider, word_limit)
+        if (
+            constraints.min_quality_tier is None
+            or estimate["quality_tier"] >= constraints.min_quality_tier
+        ):
+            qualified.append((model_name, estimate))
+    if not qualified:
+        raise ModelSelectionError(
+            f"No model meets quality tier {constraints.min_quality_tier}"
+        )
+    eligible = [
+        (model_name, estimate)
+        for model_name, estimate in qualified
+        if estimate["error_rate"] <= settings.auto_max_error_rate
+    ]
+    # If every model is failing, keep trying them rather than refusing to answer.
+    eligible = eligible or qualified
+
+    configured_order = {name: i for i, name in enumerate(settings.local_models)}
+
+    def rank(item: Tuple[str, dict]) -> tuple:
+        model_name, estimate = item
+        objective = (estimate["latency"], estimate["cost"])
+        if constraints.prefer == "cost":
+            objective = (estimate["cost"], estimate["latency"])
+        # Break ties (e.g. no statistics yet) deterministically, not by listing order.
+        return (
+            *objective,
+            -estimate["quality_tier"],
+            configured_order.get(model_name, len(configured_order)),
+            model_name,
+        )
+
+    eligible.sort(key=rank)
+    within_limits = [
+        (model_name, estimate)
+        for model_name, estimate in eligible
+        if (
+            constraints.max_latency is None
+            or estimate["latency"] <= constraints.max_latency
+        )
+        and (constraints.max_cost is None or estimate["cost"] <= constraints.max_cost)
+    ]
+    if not within_limits:
+        raise ModelSelectionError(
+            "No model within the requested max_latency/max_cost "
+            f"(fastest estimate {min(e['latency'] for _, e in eligible):.1f}s, "
+            f"cheapest {min(e['cost'] for _, e in eligible):g})"
+        )
+    objective = "cheapest" if constraints.prefer == "cost" else "fastest"
+    model_name, estimate = within_limits[0]
+    details = {
+        "requested": auto_model_name(provider) if provider else AUTO_MODEL,
+        "reason": f"{objective} of {len(within_limits)} models within constraints",
+        "estimated_latency": round(estimate["latency"], 3),
+        "estimated_cost": estimate["cost"],
+        "quality_tier": estimate["quality_tier"],
+        "observed": estimate["observed"],
+    }
+    return model_name, details
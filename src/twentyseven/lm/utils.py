@@ -2,20 +2,45 @@
 Utility functions for interacting with the Language Model.
 """
 
+import functools
+import json
 import re
+import socket
 import textwrap
+import time
 from datetime import datetime, timezone
-from typing import Callable, Dict, Tuple, Type, TypeVar
+from typing import Callable, Dict, List, Optional, Tuple, Type, TypeVar
 from uuid import uuid4
 
 import requests
 
-from twentyseven.app.models import AnswerMetadata, ConclusionMetadata
+from twentyseven.app.models import (
+    AnswerMetadata,
+    ConclusionMetadata,
+    ModelConstraints,
+)
 from twentyseven.config.logger import logger
 from twentyseven.config.settings import settings
+from twentyseven.lm.budget import token_budget
+from twentyseven.lm.cancellation import (
+    CancellationToken,
+    GenerationCancelled,
+    cancellation_stats,
+)
+from twentyseven.lm.local_models import local_model_registry
+from twentyseven.lm.performance import model_performance
+from twentyseven.lm.selection import (
+    ModelSelectionError,
+    parse_auto_model,
+    select_model,
+)
 
 T = TypeVar("T")
 
+_THINK_BLOCK_RE = re.compile(r"<think>[\s\S]*?</think>", flags=re.IGNORECASE)
+# End of a sentence (terminal punctuation followed by whitespace) or of a line.
+_SENTENCE_BOUNDARY_RE = re.compile(r"[.!?…][\"'”’)\]*_]*(?=\s)|\n")
+
 
 def remove_think_tags(text: str) -> str:
     """
@@ -27,7 +52,7 @@ def remove_think_tags(text: str) -> str:
     Returns:
         str: The text with <think> tags and their content removed.
     """
-    return re.sub(r"<think>[\s\S]*?</think>", "", text, flags=re.IGNORECASE).strip()
+    return _THINK_BLOCK_RE.sub("", text).strip()
 
 
 def get_provider_from_model(model_name: str) -> str:
@@ -40,8 +65,8 @@ def get_provider_from_model(model_name: str) -> str:
     Returns:
         str: The provider name ('local', 'huggingface', 'openrouter').
     """
-    # Check local models
-    if model_name in settings.local_models:
+    # Check local models (discovered from the local endpoint, or configured)
+    if model_name in local_model_registry.list_models():
         return "local"
 
     # Check external models (now only openrouter)
@@ -56,23 +81,192 @@ def get_provider_from_model(model_name: str) -> str:
     return "local"
 
 
-def _call_local_llm(
-    prompt: str, system_message: str, model_name: str, temperature: float
-) -> str:
+def _split_reasoning(text: str) -> Tuple[str, str]:
     """
-    Call a local LLM via the LM Studio endpoint.
+    Split raw model output into its visible part and its <think> reasoning part.
+
+    An unclosed <think> tag (reasoning still in progress or truncated) counts as reasoning.
+
+    Args:
+        text (str): The raw model output.
+
+    Returns:
+        Tuple[str, str]: The visible text and the reasoning text.
+    """
+    reasoning = [m.group(0) for m in _THINK_BLOCK_RE.finditer(text)]
+    visible = _THINK_BLOCK_RE.sub("", text)
+    open_idx = visible.lower().find("<think>")
+    if open_idx != -1:
+        reasoning.append(visible[open_idx:])
+        visible = visible[:open_idx]
+    return visible, " ".join(reasoning)
+
+
+def _abort_response(response: requests.Response) -> None:
+    """
+    Shut down a streaming response's connection so a read blocked on it returns at once.
+
+    Closing the response from another thread does not wake a blocked read; shutting
+    the socket down does.
+
+    Args:
+        response (requests.Response): The streaming response to abort.
+    """
+    connection = getattr(response.raw, "connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass  # Already closed.
+
+
+def _stream_chat_completion(
+    url: str,
+    headers: Dict[str, str],
+    payload: dict,
+    word_limit: int,
+    cancel_token: Optional[CancellationToken] = None,
+) -> Tuple[str, str, Optional[int], int, bool]:
+    """
+    Stream a chat completion, stopping once the visible word limit is reached at a sentence boundary.
+
+    Closing the stream early makes the server stop decoding text that would be cut anyway.
+    The same mechanism aborts the generation when ``cancel_token`` is cancelled: the
+    connection is shut down immediately, even while the read is blocked waiting for
+    a queued or prefilling generation to produce its first token.
+
+    Args:
+        url (str): The chat completions endpoint.
+        headers (Dict[str, str]): Request headers.
+        payload (dict): The request payload (without streaming options).
+        word_limit (int): The maximum number of visible words.
+        cancel_token (Optional[CancellationToken]): Token that aborts the stream when cancelled.
+
+    Returns:
+        Tuple[str, str, Optional[int], int, bool]: The content, any separately reported
+            reasoning, the completion tokens reported by the server (None if the stream
+            closed before the usage event), the number of streamed chunks and whether
+            generation was stopped early.
+
+    Raises:
+        GenerationCancelled: If ``cancel_token`` is cancelled mid-stream.
+    """
+    payload = {**payload, "stream": True, "stream_options": {"include_usage": True}}
+    parts: List[str] = []
+    reasoning_parts: List[str] = []
+    chunks = 0
+    usage_tokens = None
+    limit_reached_at = None
+    stopped_early = False
+    hard_limit = word_limit * (1 + settings.token_budget_margin)
+    with requests.post(
+        url, json=payload, headers=headers, timeout=60, stream=True
+    ) as response:
+        response.raise_for_status()
+        abort = functools.partial(_abort_response, response)
+        if cancel_token is not None:
+            cancel_token.add_callback(abort)
+        try:
+            for line in response.iter_lines():
+                if cancel_token is not None and cancel_token.cancelled:
+                    break
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    break
+                event = json.loads(data)
+                if event.get("usage"):
+                    usage_tokens = event["usage"].get("completion_tokens")
+                choices = event.get("choices") or []
+                if not choices:
+                    continue
+                delta = choices[0].get("delta") or {}
+                reasoning_delta = delta.get("reasoning_content") or delta.get(
+                    "reasoning"
+                )
+                if reasoning_delta:
+                    reasoning_parts.append(reasoning_delta)
+                    chunks += 1
+                text = delta.get("content")
+                if not text:
+                    continue
+                parts.append(text)
+                chunks += 1
+
+                content = "".join(parts)
+                if content.lower().rfind("<think>") > content.lower().rfind("</think>"):
+                    continue  # Still reasoning.
+                visible, _ = _split_reasoning(content)
+                words = len(visible.split())
+                if words < word_limit:
+                    continue
+                if limit_reached_at is None:
+                    limit_reached_at = max(0, len(visible) - len(text) - 1)
+                boundary = _SENTENCE_BOUNDARY_RE.search(visible, limit_reached_at)
+                if boundary is not None:
+                    # Drop whatever follows the boundary; the visible tail equals the content tail.
+                    parts = [content[: len(content) - (len(visible) - boundary.end())]]
+                    stopped_early = True
+                    break
+                if words >= hard_limit:
+                    stopped_early = True
+                    break
+        except requests.RequestException:
+            # Cancelling shuts the connection down, which ends a blocked read with an error.
+            if cancel_token is None or not cancel_token.cancelled:
+                raise
+        finally:
+            if cancel_token is not None:
+                cancel_token.remove_callback(abort)
+        if cancel_token is not None and cancel_token.cancelled:
+            # Leaving the `with` block closes the connection, aborting the generation.
+            cancellation_stats.record_aborted(payload["max_tokens"], chunks)
+            cancel_token.raise_if_cancelled()
+    return (
+        "".join(parts),
+        "".join(reasoning_parts),
+        usage_tokens,
+        chunks,
+        stopped_early,
+    )
+
+
+def _call_chat_completion(
+    url: str,
+    headers: Dict[str, str],
+    prompt: str,
+    system_message: str,
+    model_name: str,
+    temperature: float,
+    word_limit: int,
+    cancel_token: Optional[CancellationToken] = None,
+) -> Tuple[str, dict]:
+    """
+    Call an OpenAI-compatible chat completions endpoint with an adaptive token budget.
 
     Args:
+        url (str): The chat completions endpoint.
+        headers (Dict[str, str]): Request headers.
         prompt (str): The user prompt.
         system_message (str): The system message for the LLM.
         model_name (str): The model to use.
         temperature (float): The temperature for generation.
+        word_limit (int): The maximum number of visible words.
+        cancel_token (Optional[CancellationToken]): Token used to cancel the generation.
 
     Returns:
-        str: The generated content from the LLM.
+        Tuple[str, dict]: The generated content and generation details for metadata.
+
+    Raises:
+        GenerationCancelled: If ``cancel_token`` is cancelled.
     """
-    url = settings.lm_studio_endpoint
-    headers = {"Content-Type": "application/json"}
+    max_tokens = token_budget.max_tokens(model_name, word_limit)
+    if cancel_token is not None and cancel_token.cancelled:
+        cancellation_stats.record_skipped(max_tokens)
+        cancel_token.raise_if_cancelled()
     payload = {
         "model": model_name,
         "messages": [
@@ -80,18 +274,94 @@ def _call_local_llm(
             {"role": "user", "content": prompt},
         ],
         "temperature": temperature,
-        "max_tokens": 1024,
+        "max_tokens": max_tokens,
     }
-    response = requests.post(url, json=payload, headers=headers, timeout=60)
-    response.raise_for_status()
-    data = response.json()
-    print("local_llm", data)
-    return data["choices"][0]["message"]["content"]
+    if settings.stream_generation:
+        content, extra_reasoning, completion_tokens, chunks, stopped_early = (
+            _stream_chat_completion(url, headers, payload, word_limit, cancel_token)
+        )
+    else:
+        # A non-streaming request cannot be interrupted once sent.
+        response = requests.post(url, json=payload, headers=headers, timeout=60)
+        if cancel_token is not None and cancel_token.cancelled:
+            cancellation_stats.record_abandoned()
+            cancel_token.raise_if_cancelled()
+        response.raise_for_status()
+        data = response.json()
+        message = data["choices"][0]["message"]
+        content = message["content"]
+        extra_reasoning = (
+            message.get("reasoning_content") or message.get("reasoning") or ""
+        )
+        completion_tokens = (data.get("usage") or {}).get("completion_tokens")
+        chunks = None
+        stopped_early = False
+    details = {
+        "max_tokens": max_tokens,
+        "completion_tokens": completion_tokens,
+        "stopped_early": stopped_early,
+    }
+    if completion_tokens is not None:
+        visible, reasoning = _split_reasoning(content)
+        token_budget.record(
+            model_name,
+            completion_tokens=completion_tokens,
+            visible_words=len(visible.split()),
+            reasoning_words=len(reasoning.split()) + len(extra_reasoning.split()),
+        )
+    elif chunks is not None:
+        # Streams stopped early close before the usage event. A chunk may carry
+        # several tokens, so the count is only an estimate and is not learned from.
+        details["completion_tokens_estimate"] = chunks
+    return content, details
+
+
+def _call_local_llm(
+    prompt: str,
+    system_message: str,
+    model_name: str,
+    temperature: float,
+    word_limit: int,
+    cancel_token: Optional[CancellationToken] = None,
+) -> Tuple[str, dict]:
+    """
+    Call a local LLM via the LM Studio endpoint.
+
+    Args:
+        prompt (str): The user prompt.
+        system_message (str): The system message for the LLM.
+        model_name (str): The model to use.
+        temperature (float): The temperature for generation.
+        word_limit (int): The maximum number of visible words.
+        cancel_token (Optional[CancellationToken]): Token used to cancel the generation.
+
+    Returns:
+        Tuple[str, dict]: The generated content from the LLM and generation details.
+    """
+    url = settings.lm_studio_endpoint
+    headers = {"Content-Type": "application/json"}
+    result = _call_chat_completion(
+        url,
+        headers,
+        prompt,
+        system_message,
+        model_name,
+        temperature,
+        word_limit,
+        cancel_token,
+    )
+    local_model_registry.mark_warm(model_name)
+    return result
 
 
 def _call_openrouter_llm(
-    prompt: str, system_message: str, model_name: str, temperature: float
-) -> str:
+    prompt: str,
+    system_message: str,
+    model_name: str,
+    temperature: float,
+    word_limit: int,
+    cancel_token: Optional[CancellationToken] = None,
+) -> Tuple[str, dict]:
     """
     Call OpenRouter LLM using the OpenRouter API endpoint.
 
@@ -100,28 +370,27 @@ def _call_openrouter_llm(
         system_message (str): The system message for the LLM.
         model_name (str): The model to use.
         temperature (float): The temperature for generation.
+        word_limit (int): The maximum number of visible words.
+        cancel_token (Optional[CancellationToken]): Token used to cancel the generation.
 
     Returns:
-        str: The generated content from the LLM.
+        Tuple[str, dict]: The generated content from the LLM and generation details.
     """
     url = settings.openrouter_endpoint
     headers = {
         "Authorization": f"Bearer {settings.openrouter_api_key}",
         "Content-Type": "application/json",
     }
-    payload = {
-        "model": model_name,
-        "messages": [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": prompt},
-        ],
-        "temperature": temperature,
-        "max_tokens": 1024,
-    }
-    response = requests.post(url, json=payload, headers=headers, timeout=60)
-    response.raise_for_status()
-    data = response.json()
-    return data["choices"][0]["message"]["content"]
+    return _call_chat_completion(
+        url,
+        headers,
+        prompt,
+        system_message,
+        model_name,
+        temperature,
+        word_limit,
+        cancel_token,
+    )
 
 
 def _generate_text_with_metadata(
@@ -133,6 +402,9 @@ def _generate_text_with_metadata(
     temperature: float,
     extract_text_fn: Callable[[str], str],
     logger_prefix: str,
+    word_limit: int,
+    cancel_token: Optional[CancellationToken] = None,
+    model_constraints: Optional[ModelConstraints] = None,
 ) -> Tuple[str, T]:
     """
     Helper to generate text using LLM and return text with metadata.
@@ -140,29 +412,76 @@ def _generate_text_with_metadata(
     Args:
         prompt (str): The user prompt.
         system_message (str): The system message for the LLM.
-        model_name (str): The model to use.
+        model_name (str): The model to use, or 'auto' / 'auto:<provider>' to select
+            one per call.
         metadata_class (Type[T]): The metadata class to use for the response.
         prompt_uuid (str): Unique identifier for the prompt.
         temperature (float): The temperature for generation.
         extract_text_fn (Callable[[str], str]): Function to extract/clean the generated text.
         logger_prefix (str): Prefix for logging.
+        word_limit (int): The maximum number of visible words to generate.
+        cancel_token (Optional[CancellationToken]): Token used to cancel the generation.
+        model_constraints (Optional[ModelConstraints]): Constraints for automatic model selection.
 
     Returns:
         Tuple[str, T]: The generated text and its metadata.
+
+    Raises:
+        GenerationCancelled: If ``cancel_token`` is cancelled.
+        ModelSelectionError: If 'auto' cannot satisfy ``model_constraints``.
+        RuntimeError: If the generation fails.
     """
+    selection = None
+    try:
+        is_auto, auto_provider = parse_auto_model(model_name)
+        if is_auto:
+            model_name, selection = select_model(
+                word_limit, model_constraints, auto_provider
+            )
+    except ModelSelectionError as exc:
+        logger.warning(f"{logger_prefix}: {exc}")
+        raise
+    if selection is not None:
+        logger.info(
+            f"{logger_prefix}: Auto-selected model {model_name} ({selection['reason']})"
+        )
     provider = get_provider_from_model(model_name)
+    start = time.monotonic()
     try:
         logger.info(
             f"{logger_prefix}: Using model {model_name} from provider {provider}"
         )
         if provider == "local":
-            text = _call_local_llm(prompt, system_message, model_name, temperature)
+            text, details = _call_local_llm(
+                prompt,
+                system_message,
+                model_name,
+                temperature,
+                word_limit,
+                cancel_token,
+            )
         elif provider == "openrouter":
             if not settings.openrouter_api_key:
                 raise ValueError("OpenRouter API key not configured")
-            text = _call_openrouter_llm(prompt, system_message, model_name, temperature)
+            text, details = _call_openrouter_llm(
+                prompt,
+                system_message,
+                model_name,
+                temperature,
+                word_limit,
+                cancel_token,
+            )
         else:
             raise ValueError(f"Unsupported provider: {provider}")
+        # Streams stopped early have no server-reported count; throughput skips them.
+        model_performance.record(
+            model_name,
+            latency=time.monotonic() - start,
+            completion_tokens=details["completion_tokens"],
+            ok=True,
+        )
+        if selection is not None:
+            details["model_selection"] = selection
         text = extract_text_fn(str(text))
         output_tokens = len(text.split())
         metadata = metadata_class(
@@ -173,19 +492,29 @@ def _generate_text_with_metadata(
                 "output_tokens": output_tokens,
                 "temperature": temperature,
                 "prompt_uuid": prompt_uuid,
-                "extra": {},
+                "extra": details,
             }
         )
         logger.info(f"{logger_prefix}: Successfully generated {output_tokens} tokens")
         return text, metadata
+    except GenerationCancelled:
+        logger.info(f"{logger_prefix}: Cancelled after client disconnect")
+        raise
     except Exception as exc:
+        model_performance.record(
+            model_name, latency=time.monotonic() - start, completion_tokens=0, ok=False
+        )
         logger.error(f"{logger_prefix} failed: {exc}")
         logger.error(f"Model: {model_name}, Provider: {provider}")
         raise RuntimeError(f"{logger_prefix} failed: {exc}") from exc
 
 
 def generate_answer(
-    question: str, perspective: str, model_name: str
+    question: str,
+    perspective: str,
+    model_name: str,
+    cancel_token: Optional[CancellationToken] = None,
+    model_constraints: Optional[ModelConstraints] = None,
 ) -> Tuple[str, AnswerMetadata]:
     """
     Generate an answer to a question from a specific philosophical perspective, and return answer and metadata.
@@ -193,12 +522,16 @@ def generate_answer(
     Args:
         question (str): The user's question.
         perspective (str): The philosophical text to embody.
-        model_name (str): The model to use.
+        model_name (str): The model to use, or 'auto' to select one.
+        cancel_token (Optional[CancellationToken]): Token used to cancel the generation.
+        model_constraints (Optional[ModelConstraints]): Constraints for automatic model selection.
 
     Returns:
         Tuple[str, AnswerMetadata]: The generated answer and its metadata.
 
     Raises:
+        GenerationCancelled: If ``cancel_token`` is cancelled.
+        ModelSelectionError: If 'auto' cannot satisfy ``model_constraints``.
         RuntimeError: If the answer generation fails.
     """
     logger.info(
@@ -238,23 +571,33 @@ def generate_answer(
         temperature=temperature,
         extract_text_fn=remove_think_tags,
         logger_prefix="Answer generation",
+        word_limit=settings.max_words_answer,
+        cancel_token=cancel_token,
+        model_constraints=model_constraints,
     )
 
 
 def generate_conclusion(
-    answers: Dict[str, str], model_name: str
+    answers: Dict[str, str],
+    model_name: str,
+    cancel_token: Optional[CancellationToken] = None,
+    model_constraints: Optional[ModelConstraints] = None,
 ) -> Tuple[str, ConclusionMetadata]:
     """
     Generate a conclusion based on multiple answers and a model, and return the conclusion and its metadata.
 
     Args:
         answers (Dict[str, str]): Dictionary mapping perspective names to answers.
-        model_name (str): The model to use.
+        model_name (str): The model to use, or 'auto' to select one.
+        cancel_token (Optional[CancellationToken]): Token used to cancel the generation.
+        model_constraints (Optional[ModelConstraints]): Constraints for automatic model selection.
 
     Returns:
         Tuple[str, ConclusionMetadata]: The generated conclusion and its metadata.
 
     Raises:
+        GenerationCancelled: If ``cancel_token`` is cancelled.
+        ModelSelectionError: If 'auto' cannot satisfy ``model_constraints``.
         RuntimeError: If the conclusion generation fails.
     """
     logger.info(f"Generating conclusion from {len(answers)} answers.")
@@ -291,4 +634,7 @@ def generate_conclusion(
         temperature=temperature,
         extract_text_fn=remove_think_tags,
         logger_prefix="Conclusion generation",
+        word_limit=settings.max_words_conclusion,
+        cancel_token=cancel_token,
+        model_constraints=model_constraints,
     )